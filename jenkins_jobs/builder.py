@@ -18,41 +18,84 @@
 import errno
 import os
 import operator
-import hashlib
 import yaml
-import xml.etree.ElementTree as XML
+try:
+    import xml.etree.cElementTree as XML
+except ImportError:
+    import xml.etree.ElementTree as XML
 import jenkins
 import re
 from pprint import pformat
 import logging
+from multiprocessing.pool import ThreadPool
 
 from jenkins_jobs.constants import MAGIC_MANAGE_STRING
 from jenkins_jobs.parser import YamlParser
+from jenkins_jobs.xml_config import config_hash
+
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
 
 logger = logging.getLogger(__name__)
 
+YAML_EXTENSIONS = ('.yml', '.yaml')
+
+# default of cache lookups, never equal to a hash
+_MISSING = object()
+
+
+def _list_yaml_files(path):
+    return [os.path.join(path, f) for f in os.listdir(path)
+            if f.endswith(YAML_EXTENSIONS)]
+
 
 class CacheStorage(object):
-    # ensure each instance of the class has a reference to the required
-    # modules so that they are available to be used when the destructor
-    # is being called since python will not guarantee that it won't have
-    # removed global module references during teardown.
-    _yaml = yaml
-    _logger = logger
+    """Cache of the hashes of the jobs and views pushed to one Jenkins
+    instance.
+
+    The cache file is only read when the cached data is first accessed.
+    Changes are written out by :meth:`save`, which is called when leaving
+    the outermost ``with`` block using the instance, and only touches the
+    cache file if something was set since the last save.
+    """
+
+    # anything but letters, digits, '~' and '-' is replaced in the url
+    _host_vary_re = re.compile(r'[^A-Za-z0-9~-]')
 
     def __init__(self, jenkins_url, flush=False):
+        self._dirty = flush
+        self._depth = 0
         cache_dir = self.get_cache_dir()
         # One cache per remote Jenkins URL:
-        host_vary = re.sub('[^A-Za-z0-9\-\~]', '_', jenkins_url)
+        host_vary = self._host_vary_re.sub('_', jenkins_url)
         self.cachefilename = os.path.join(
             cache_dir, 'cache-host-jobs-' + host_vary + '.yml')
         if flush or not os.path.isfile(self.cachefilename):
-            self.data = {}
+            self._data = {}
         else:
-            with open(self.cachefilename, 'r') as yfile:
-                self.data = yaml.load(yfile)
+            self._data = None
         logger.debug("Using cache: '{0}'".format(self.cachefilename))
 
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = self._load()
+        return self._data
+
+    def _load(self):
+        with open(self.cachefilename, 'rb') as yfile:
+            try:
+                # an empty cache file loads as None
+                return yaml.load(yfile, Loader=SafeLoader) or {}
+            except yaml.constructor.ConstructorError as e:
+                # caches written by older versions may carry python
+                # specific tags, start over rather than failing
+                logger.warning("Discarding unreadable cache file "
+                               "'{0}': {1}".format(self.cachefilename, e))
+                return {}
+
     @staticmethod
     def get_cache_dir():
         home = os.path.expanduser('~')
@@ -67,34 +110,38 @@ class CacheStorage(object):
 
     def set(self, job, md5):
         self.data[job] = md5
+        self._dirty = True
 
     def is_cached(self, job):
-        if job in self.data:
-            return True
-        return False
+        return job in self.data
 
     def has_changed(self, job, md5):
-        if job in self.data and self.data[job] == md5:
-            return False
-        return True
+        return self.data.get(job, _MISSING) != md5
 
     def save(self):
-        # check we initialized sufficiently in case called via __del__
-        # due to an exception occurring in the __init__
-        if getattr(self, 'data', None) is not None:
-            try:
-                with open(self.cachefilename, 'w') as yfile:
-                    self._yaml.dump(self.data, yfile)
-            except Exception as e:
-                self._logger.error("Failed to write to cache file '%s' on "
-                                   "exit: %s" % (self.cachefilename, e))
-            else:
-                self._logger.info("Cache saved")
-                self._logger.debug("Cache written out to '%s'" %
-                                   self.cachefilename)
+        if not self._dirty:
+            logger.debug("Cache unchanged, not saving")
+            return
+        try:
+            with open(self.cachefilename, 'wb') as yfile:
+                yaml.dump(self.data, yfile, Dumper=SafeDumper,
+                          encoding='utf-8')
+        except Exception as e:
+            logger.error("Failed to write to cache file '%s' on "
+                         "exit: %s" % (self.cachefilename, e))
+        else:
+            self._dirty = False
+            logger.info("Cache saved")
+            logger.debug("Cache written out to '%s'" % self.cachefilename)
+
+    def __enter__(self):
+        self._depth += 1
+        return self
 
-    def __del__(self):
-        self.save()
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._depth -= 1
+        if not self._depth:
+            self.save()
 
 
 class Jenkins(object):
@@ -104,6 +151,7 @@ class Jenkins(object):
         self._job_list = None
         self._views = None
         self._view_list = None
+        self._managed = {}
 
     @property
     def jobs(self):
@@ -140,28 +188,35 @@ class Jenkins(object):
         else:
             logger.info("Creating jenkins job {0}".format(job_name))
             self.jenkins.create_job(job_name, xml)
+            self.job_list.add(job_name)
 
-    def is_job(self, job_name):
+    def is_job(self, job_name, fresh=False):
         # first use cache
         if job_name in self.job_list:
             return True
 
-        # if not exists, use jenkins
-        return self.jenkins.job_exists(job_name)
+        # jobs within folders are not part of the cached list, so they are
+        # the only ones for which jenkins still has to be asked by default
+        if fresh or '/' in job_name:
+            return self.jenkins.job_exists(job_name)
+        return False
 
     def get_job_md5(self, job_name):
         xml = self.jenkins.get_job_config(job_name)
-        return hashlib.md5(xml).hexdigest()
+        return config_hash(xml)
 
     def delete_job(self, job_name):
         if self.is_job(job_name):
             logger.info("Deleting jenkins job {0}".format(job_name))
             self.jenkins.delete_job(job_name)
+            self.job_list.discard(job_name)
+            self._managed.pop(job_name, None)
 
     def delete_view(self, view_name):
         if self.is_view(view_name):
             logger.info("Deleting jenkins job {0}".format(view_name))
             self.jenkins.delete_view(view_name)
+            self.view_list.discard(view_name)
 
     def update_view(self, view_name, xml):
         if self.is_view(view_name):
@@ -170,18 +225,21 @@ class Jenkins(object):
         else:
             logger.info("Creating jenkins view {0}".format(view_name))
             self.jenkins.create_view(view_name, xml)
+            self.view_list.add(view_name)
 
-    def is_view(self, view_name):
+    def is_view(self, view_name, fresh=False):
         # first use cache
         if view_name in self.view_list:
             return True
 
-        # if not exists, use jenkins
-        return self.jenkins.view_exists(view_name)
+        # views within folders are not part of the cached list either
+        if fresh or '/' in view_name:
+            return self.jenkins.view_exists(view_name)
+        return False
 
     def get_view_md5(self, view_name):
         xml = self.jenkins.get_view_config(view_name)
-        return hashlib.md5(xml).hexdigest()
+        return config_hash(xml)
 
     def get_plugins_info(self):
         """ Return a list of plugin_info dicts, one for each plugin on the
@@ -216,6 +274,11 @@ class Jenkins(object):
         return self.views
 
     def is_managed(self, job_name):
+        if job_name not in self._managed:
+            self._managed[job_name] = self._is_managed(job_name)
+        return self._managed[job_name]
+
+    def _is_managed(self, job_name):
         xml = self.jenkins.get_job_config(job_name)
         try:
             out = XML.fromstring(xml)
@@ -229,11 +292,12 @@ class Jenkins(object):
 class Builder(object):
     def __init__(self, jenkins_url, jenkins_user, jenkins_password,
                  config=None, ignore_cache=False, flush_cache=False,
-                 plugins_list=None):
+                 plugins_list=None, workers=16):
         self.jenkins = Jenkins(jenkins_url, jenkins_user, jenkins_password)
         self.cache = CacheStorage(jenkins_url, flush=flush_cache)
         self.global_config = config
         self.ignore_cache = ignore_cache
+        self.workers = workers
         self._plugins_list = plugins_list
 
     @property
@@ -257,19 +321,18 @@ class Builder(object):
         files_to_process = []
         for path in fn:
             if os.path.isdir(path):
-                files_to_process.extend([os.path.join(path, f)
-                                         for f in os.listdir(path)
-                                         if (f.endswith('.yml')
-                                             or f.endswith('.yaml'))])
+                files_to_process.extend(_list_yaml_files(path))
             else:
                 files_to_process.append(path)
 
         # symlinks used to allow loading of sub-dirs can result in duplicate
         # definitions of macros and templates when loading all from top-level
         unique_files = []
+        seen_files = set()
         for f in files_to_process:
             rpf = os.path.realpath(f)
-            if rpf not in unique_files:
+            if rpf not in seen_files:
+                seen_files.add(rpf)
                 unique_files.append(rpf)
             else:
                 logger.warning("File '%s' already added as '%s', ignoring "
@@ -294,16 +357,22 @@ class Builder(object):
         deleted_jobs = 0
         if keep is None:
             keep = [job.name for job in self.parser.xml_jobs]
-        for job in jobs:
-            if job['name'] not in keep and \
-                    self.jenkins.is_managed(job['name']):
-                logger.info("Removing obsolete jenkins job {0}"
-                            .format(job['name']))
-                self.delete_job(job['name'])
-                deleted_jobs += 1
-            else:
-                logger.debug("Ignoring unmanaged jenkins job %s",
-                             job['name'])
+        keep = set(keep)
+        # retrieve the configurations of the candidates concurrently, the
+        # results are then served from the Jenkins.is_managed memo
+        self._map(self.jenkins.is_managed,
+                  [job['name'] for job in jobs if job['name'] not in keep])
+        with self.cache:
+            for job in jobs:
+                if job['name'] not in keep and \
+                        self.jenkins.is_managed(job['name']):
+                    logger.info("Removing obsolete jenkins job {0}"
+                                .format(job['name']))
+                    self.delete_job(job['name'])
+                    deleted_jobs += 1
+                else:
+                    logger.debug("Ignoring unmanaged jenkins job %s",
+                                 job['name'])
         return deleted_jobs
 
     def delete_job(self, jobs_glob, fn=None):
@@ -316,10 +385,11 @@ class Builder(object):
 
         if jobs is not None:
             logger.info("Removing jenkins job(s): %s" % ", ".join(jobs))
-        for job in jobs:
-            self.jenkins.delete_job(job)
-            if(self.cache.is_cached(job)):
-                self.cache.set(job, '')
+        with self.cache:
+            for job in jobs:
+                self.jenkins.delete_job(job)
+                if(self.cache.is_cached(job)):
+                    self.cache.set(job, '')
 
     def delete_view(self, jobs_glob, fn=None):
         if fn:
@@ -331,22 +401,25 @@ class Builder(object):
 
         if views is not None:
             logger.info("Removing jenkins view(s): %s" % ", ".join(views))
-        for view in views:
-            self.jenkins.delete_view(view)
-            if self.cache.is_cached(view):
-                self.cache.set(view, '')
+        with self.cache:
+            for view in views:
+                self.jenkins.delete_view(view)
+                if self.cache.is_cached(view):
+                    self.cache.set(view, '')
 
     def delete_all_jobs(self):
         jobs = self.jenkins.get_jobs()
         logger.info("Number of jobs to delete:  %d", len(jobs))
-        for job in jobs:
-            self.delete_job(job['name'])
+        with self.cache:
+            for job in jobs:
+                self.delete_job(job['name'])
 
     def delete_all_views(self):
         views = self.jenkins.get_views()
         logger.info("Number of views to delete:  %d", len(views))
-        for view in views:
-            self.delete_view(view['name'])
+        with self.cache:
+            for view in views:
+                self.delete_view(view['name'])
 
     def write_xml(self, item, output, kind):
         if hasattr(output, 'write'):
@@ -354,7 +427,7 @@ class Builder(object):
             logger.info("%s name:  %s", kind, item.name)
             logger.debug("Writing XML to '{0}'".format(output))
             try:
-                output.write(item.output())
+                item.write_to(output)
             except IOError as exc:
                 if exc.errno == errno.EPIPE:
                     # EPIPE could happen if piping output to something
@@ -366,12 +439,69 @@ class Builder(object):
 
         output_fn = os.path.join(output, item.name)
         logger.debug("Writing XML to '{0}'".format(output_fn))
-        f = open(output_fn, 'w')
-        f.write(item.output())
-        f.close()
+        with open(output_fn, 'wb') as f:
+            item.write_to(f)
         return False
 
+    def _cache_remote_hashes(self, items, exists, get_md5):
+        """Cache the hash of the current configuration of the items which
+        exist on Jenkins but are not cached yet, retrieving the
+        configurations concurrently.
+        """
+        names = [item.name for item in items
+                 if exists(item.name) and not self.cache.is_cached(item.name)]
+        for name, md5 in zip(names, self._map(get_md5, names)):
+            self.cache.set(name, md5)
+
+    def _push_job(self, item):
+        job, md5 = item
+        self.jenkins.update_job(job.name, job.output())
+        return item
+
+    def _push_view(self, item):
+        view, md5 = item
+        self.jenkins.update_view(view.name, view.output())
+        return item
+
+    def _map(self, func, items):
+        """Call `func` on each of `items` using a pool of threads and
+        return the list of results.
+        """
+        if not items:
+            return []
+
+        pool = ThreadPool(min(self.workers, len(items)))
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _push_items(self, push, items):
+        """Call `push` on each of the (item, md5) tuples using a pool of
+        threads, yielding the tuples as they are pushed. Items are pushed
+        by increasing folder depth so that a folder always exists before
+        the items it contains.
+        """
+        if not items:
+            return
+
+        pool = ThreadPool(min(self.workers, len(items)))
+        try:
+            depths = sorted(set(item.name.count('/') for item, _ in items))
+            for depth in depths:
+                batch = [i for i in items if i[0].name.count('/') == depth]
+                for pushed in pool.imap_unordered(push, batch):
+                    yield pushed
+        finally:
+            pool.terminate()
+            pool.join()
+
     def update_job(self, input_fn, jobs_glob=None, output=None):
+        with self.cache:
+            return self._update_job(input_fn, jobs_glob, output)
+
+    def _update_job(self, input_fn, jobs_glob, output):
         self.load_files(input_fn)
         self.parser.expandYaml(jobs_glob)
         self.parser.generateXML()
@@ -393,41 +523,52 @@ class Builder(object):
         updated_jobs = 0
         updated_views = 0
 
+        if not output:
+            # retrieve the existing jobs and views once, rather than
+            # querying jenkins for each of them
+            if self.parser.xml_jobs:
+                self.jenkins.get_jobs()
+            if self.parser.xml_views:
+                self.jenkins.get_views()
+            self._cache_remote_hashes(self.parser.xml_jobs,
+                                      self.jenkins.is_job,
+                                      self.jenkins.get_job_md5)
+            self._cache_remote_hashes(self.parser.xml_views,
+                                      self.jenkins.is_view,
+                                      self.jenkins.get_view_md5)
+
+        jobs_to_update = []
         for job in self.parser.xml_jobs:
             if output:
                 if self.write_xml(item=job, output=output, kind='Job'):
                     return
                 continue
             md5 = job.md5()
-            if (self.jenkins.is_job(job.name)
-                    and not self.cache.is_cached(job.name)):
-                old_md5 = self.jenkins.get_job_md5(job.name)
-                self.cache.set(job.name, old_md5)
-
             if self.cache.has_changed(job.name, md5) or self.ignore_cache:
-                self.jenkins.update_job(job.name, job.output())
-                updated_jobs += 1
-                self.cache.set(job.name, md5)
+                jobs_to_update.append((job, md5))
             else:
                 logger.debug("Job: '{0}' has not changed".format(job.name))
 
+        for job, md5 in self._push_items(self._push_job, jobs_to_update):
+            updated_jobs += 1
+            self.cache.set(job.name, md5)
+
+        views_to_update = []
         for view in self.parser.xml_views:
             if output:
                 if self.write_xml(item=view, output=output, kind='View'):
                     return
                 continue
             md5 = view.md5()
-            if (self.jenkins.is_view(view.name)
-                    and not self.cache.is_cached(view.name)):
-                old_md5 = self.jenkins.get_view_md5(view.name)
-                self.cache.set(view.name, old_md5)
             if self.cache.has_changed(view.name, md5) or self.ignore_cache:
-                self.jenkins.update_view(view.name, view.output())
-                updated_views += 1
-                self.cache.set(view.name, md5)
+                views_to_update.append((view, md5))
             else:
                 logger.debug("View: '{0}' has not changed".format(view.name))
 
+        for view, md5 in self._push_items(self._push_view, views_to_update):
+            updated_views += 1
+            self.cache.set(view.name, md5)
+
         xml_jobs = self.parser.xml_jobs
         xml_views = self.parser.xml_views
         return xml_jobs, xml_views, updated_jobs, updated_views
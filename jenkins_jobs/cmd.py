@@ -43,6 +43,7 @@ url=http://localhost:8080/
 user=
 password=
 query_plugins_info=True
+workers=16
 
 [hipchat]
 authtoken=dummy
@@ -105,6 +106,10 @@ def create_parser():
     parser_update.add_argument('--delete-old', help='delete obsolete jobs',
                                action='store_true',
                                dest='delete_old', default=False,)
+    parser_update.add_argument('--workers', type=int, dest='workers',
+                               default=None,
+                               help='number of concurrent requests sent to '
+                                    'Jenkins, 1 sends them one at a time')
 
     # subparser: test
     parser_test = subparser.add_parser('test', parents=[recursive_parser])
@@ -259,13 +264,24 @@ def execute(options, config):
                    'allow_empty_variables',
                    str(options.allow_empty_variables))
 
+    # check the workers setting: first from command line,
+    # if not present check from ini file
+    workers = getattr(options, 'workers', None)
+    if workers is None:
+        workers = config.get('jenkins', 'workers')
+    if not str(workers).isdigit() or int(workers) < 1:
+        raise JenkinsJobsException("The number of workers must be an integer "
+                                   "of at least 1, got {0}".format(workers))
+    workers = int(workers)
+
     builder = Builder(config.get('jenkins', 'url'),
                       user,
                       password,
                       config,
                       ignore_cache=ignore_cache,
                       flush_cache=options.flush_cache,
-                      plugins_list=plugins_info)
+                      plugins_list=plugins_info,
+                      workers=workers)
 
     if getattr(options, 'path', None):
         if options.path == sys.stdin:
@@ -34,6 +34,17 @@ These are parameters that are common to every Jenkins View.
 import xml.etree.ElementTree as XML
 import jenkins_jobs.modules.base
 
+# booleans substituted from template parameters are given as strings
+BOOL_TEXT = {
+    True: 'true', 'True': 'true', 'true': 'true',
+    False: 'false', 'False': 'false', 'false': 'false',
+}
+
+
+def bool_text(value):
+    """Return the 'true' or 'false' text of a boolean setting."""
+    return BOOL_TEXT.get(value, 'true' if value else 'false')
+
 
 class BaseView(jenkins_jobs.modules.base.Base):
     """
@@ -59,11 +70,11 @@ class BaseView(jenkins_jobs.modules.base.Base):
 
         filterExecutors = data.get('filter-executors', False)
         FE_element = XML.SubElement(root, 'filterExecutors')
-        FE_element.text = 'true' if filterExecutors else 'false'
+        FE_element.text = bool_text(filterExecutors)
 
         filterQueue = data.get('filter-queue', False)
         FQ_element = XML.SubElement(root, 'filterQueue')
-        FQ_element.text = 'true' if filterQueue else 'false'
+        FQ_element.text = bool_text(filterQueue)
 
         XML.SubElement(root, 'properties',
                        {'class': 'hudson.model.View$PropertyList'})
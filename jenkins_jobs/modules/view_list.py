@@ -47,6 +47,7 @@ Example:
 
 import xml.etree.ElementTree as XML
 import jenkins_jobs.modules.base
+from jenkins_jobs.modules.base_view import bool_text
 
 COLUMN_DICT = {
     'status': 'hudson.views.StatusColumn',
@@ -72,11 +73,11 @@ class List(jenkins_jobs.modules.base.Base):
 
         filterExecutors = data.get('filter-executors', False)
         FE_element = XML.SubElement(root, 'filterExecutors')
-        FE_element.text = 'true' if filterExecutors else 'false'
+        FE_element.text = bool_text(filterExecutors)
 
         filterQueue = data.get('filter-queue', False)
         FQ_element = XML.SubElement(root, 'filterQueue')
-        FQ_element.text = 'true' if filterQueue else 'false'
+        FQ_element.text = bool_text(filterQueue)
 
         XML.SubElement(root, 'properties',
                        {'class': 'hudson.model.View$PropertyList'})
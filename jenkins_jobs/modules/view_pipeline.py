@@ -59,180 +59,173 @@ Example:
 
     .. literalinclude::
         /../../tests/view_pipeline/fixtures/pipeline_view002.yaml
-"""
 
+To create a delivery pipeline view specify ``delivery-pipeline`` in the
+``view-type`` attribute. Requires the Jenkins
+:jenkins-wiki:`Delivery Pipeline Plugin <Delivery+Pipeline+Plugin>`.
 
-import xml.etree.ElementTree as XML
-import jenkins_jobs.modules.base
+:View Parameters:
+    * **name** (`str`): The name of the view, also used as the name of
+      its component.
+    * **view-type** (`str`): The type of view.
+    * **description** (`str`): A description of the view. (optional)
+    * **filter-executors** (`bool`): Show only executors that can
+      execute the included views. (default false)
+    * **filter-queue** (`bool`): Show only included jobs in builder
+      queue. (default false)
+    * **first-job** (`str`): First job of the component.
+    * **last-job** (`str`): Last job of the component. (optional)
+    * **no-of-pipelines** (`str`): Number of pipelines to display.
+      (default 3)
+    * **show-aggregated-pipeline** (`bool`): Show the aggregated view
+      of the pipeline. (default false)
+    * **no-of-columns** (`str`): Number of columns. (default 1)
+    * **sorting** (`str`): Class name of the comparator used to sort
+      the pipelines. (default none)
+    * **show-avatars** (`bool`): Show avatars. (default false)
+    * **update-interval** (`str`): Update interval in seconds.
+      (default 10)
+    * **show-changes** (`bool`): Show SCM changes. (default false)
+    * **allow-manual-triggers** (`bool`): Allow manual triggers.
+      (default false)
+    * **show-total-build-time** (`bool`): Show total build time.
+      (default false)
+    * **allow-rebuild** (`bool`): Allow rebuilding. (default false)
+    * **allow-pipeline-start** (`bool`): Allow starting a pipeline.
+      (default false)
+    * **show-description** (`bool`): Show the build description.
+      (default false)
+    * **show-promotions** (`bool`): Show promotions. (default false)
+    * **show-test-results** (`bool`): Show test results.
+      (default false)
+    * **show-static-analysis-results** (`bool`): Show static analysis
+      results. (default false)
+    * **regexp-first-jobs** (`list`): Regular expressions selecting the
+      first jobs of the pipelines. (optional)
 
+Example:
+
+    .. literalinclude::
+        /../../tests/view_pipeline/fixtures/delivery_view001.yaml
+"""
 
-class BuildPipeline(jenkins_jobs.modules.base.Base):
+
+import six
+import xml.etree.ElementTree as XML
+import jenkins_jobs.modules.base_view
+from jenkins_jobs.modules.base_view import bool_text
+
+BUILD_PIPELINE = 'au.com.centrumsystems.hudson.plugin.buildpipeline.'
+BUILD_PIPELINE_VIEW = BUILD_PIPELINE + 'BuildPipelineView'
+GRID_BUILDER = BUILD_PIPELINE + 'DownstreamProjectGridBuilder'
+
+DELIVERY_PIPELINE = 'se.diabol.jenkins.pipeline.'
+DELIVERY_PIPELINE_VIEW = DELIVERY_PIPELINE + 'DeliveryPipelineView'
+COMPONENT_SPEC = DELIVERY_PIPELINE_VIEW + '_-ComponentSpec'
+REGEXP_SPEC = DELIVERY_PIPELINE_VIEW + '_-RegExpSpec'
+
+LINK_STYLES = frozenset(['Lightbox', 'New Window'])
+
+
+def _text(value):
+    # leave the element empty when the setting is not given, strings are
+    # kept as they are since they may be unicode on python 2
+    if value is None or isinstance(value, six.string_types):
+        return value
+    return str(value)
+
+
+def _link_style(value):
+    return value if value in LINK_STYLES else 'Lightbox'
+
+
+# (tag, key, default, to_text) of the settings following gridBuilder, the
+# text of each element is to_text(data.get(key, default))
+BUILD_PIPELINE_SETTINGS = (
+    ('noOfDisplayedBuilds', 'no-of-displayed-builds', 1, str),
+    ('buildViewTitle', 'title', None, _text),
+    ('consoleOutputLinkStyle', 'link-style', 'Lightbox', _link_style),
+    ('cssUrl', 'css-Url', None, _text),
+    ('triggerOnlyLatestJob', 'latest-job-only', False, bool_text),
+    ('alwaysAllowManualTrigger', 'manual-trigger', False, bool_text),
+    ('showPipelineParameters', 'show-parameters', False, bool_text),
+    ('showPipelineParametersInHeaders', 'parameters-in-headers', False,
+     bool_text),
+    ('startsWithParameters', 'start-with-parameters', False, bool_text),
+    ('refreshFrequency', 'refresh-frequency', 3, str),
+    ('showPipelineDefinitionHeader', 'definition-header', False, bool_text),
+)
+
+# (tag, key, default, to_text) of the settings following componentSpecs
+DELIVERY_PIPELINE_SETTINGS = (
+    ('noOfPipelines', 'no-of-pipelines', '3', str),
+    ('showAggregatedPipeline', 'show-aggregated-pipeline', False, bool_text),
+    ('noOfColumns', 'no-of-columns', '1', str),
+    ('sorting', 'sorting', 'none', str),
+    ('showAvatars', 'show-avatars', False, bool_text),
+    ('updateInterval', 'update-interval', '10', str),
+    ('showChanges', 'show-changes', False, bool_text),
+    ('allowManualTriggers', 'allow-manual-triggers', False, bool_text),
+    ('showTotalBuildTime', 'show-total-build-time', False, bool_text),
+    ('allowRebuild', 'allow-rebuild', False, bool_text),
+    ('allowPipelineStart', 'allow-pipeline-start', False, bool_text),
+    ('showDescription', 'show-description', False, bool_text),
+    ('showPromotions', 'show-promotions', False, bool_text),
+    ('showTestResults', 'show-test-results', False, bool_text),
+    ('showStaticAnalysisResults', 'show-static-analysis-results', False,
+     bool_text),
+)
+
+
+def _add_settings(root, data, settings):
+    get = data.get
+    for tag, key, default, to_text in settings:
+        element = XML.Element(tag)
+        element.text = to_text(get(key, default))
+        root.append(element)
+
+
+class BuildPipeline(jenkins_jobs.modules.base_view.BaseView):
     sequence = 0
 
     def root_xml(self, data):
-        linktypes = ['Lightbox', 'New Window']
-        root = XML.Element('au.com.centrumsystems.hudson.'
-                           'plugin.buildpipeline.BuildPipelineView',
+        root = XML.Element(BUILD_PIPELINE_VIEW,
                            {'plugin': 'build-pipeline-plugin@1.4.3'})
-        XML.SubElement(root, 'name').text = data['name']
-        desc_text = data.get('description', None)
-        if desc_text is not None:
-            XML.SubElement(root, 'description').text = desc_text
-
-        filterExecutors = data.get('filter-executors', False)
-        FE_element = XML.SubElement(root, 'filterExecutors')
-        FE_element.text = str(filterExecutors).lower()
+        self.gen_view(data, root)
 
-        filterQueue = data.get('filter-queue', False)
-        FQ_element = XML.SubElement(root, 'filterQueue')
-        FQ_element.text = str(filterQueue).lower()
-
-        XML.SubElement(root, 'properties',
-                       {'class': 'hudson.model.View$PropertyList'})
-
-        GBurl = ('au.com.centrumsystems.hudson.plugin.buildpipeline.'
-                 'DownstreamProjectGridBuilder')
-        gridBuilder = XML.SubElement(root, 'gridBuilder', {'class': GBurl})
+        gridBuilder = XML.SubElement(root, 'gridBuilder',
+                                     {'class': GRID_BUILDER})
 
         jobname = data.get('first-job', '')
         XML.SubElement(gridBuilder, 'firstJob').text = jobname
 
-        builds = str(data.get('no-of-displayed-builds', 1))
-        XML.SubElement(root, 'noOfDisplayedBuilds').text = builds
-
-        title = data.get('title', None)
-        BVT_element = XML.SubElement(root, 'buildViewTitle')
-        if title is not None:
-            BVT_element.text = title
-
-        linkStyle = data.get('link-style', 'Lightbox')
-        LS_element = XML.SubElement(root, 'consoleOutputLinkStyle')
-        if linkStyle in linktypes:
-            LS_element.text = linkStyle
-        else:
-            LS_element.text = 'Lightbox'
-
-        cssUrl = data.get('css-Url', None)
-        CU_element = XML.SubElement(root, 'cssUrl')
-        if cssUrl is not None:
-            CU_element.text = cssUrl
-
-        latest_job_only = data.get('latest-job-only', False)
-        OLJ_element = XML.SubElement(root, 'triggerOnlyLatestJob')
-        OLJ_element.text = str(latest_job_only).lower()
-
-        manual_trigger = data.get('manual-trigger', False)
-        AMT_element = XML.SubElement(root, 'alwaysAllowManualTrigger')
-        AMT_element.text = str(manual_trigger).lower()
-
-        show_parameters = data.get('show-parameters', False)
-        PP_element = XML.SubElement(root, 'showPipelineParameters')
-        PP_element.text = str(show_parameters).lower()
-
-        parameters_in_headers = data.get('parameters-in-headers', False)
-        PIH_element = XML.SubElement(root, 'showPipelineParametersInHeaders')
-        PIH_element.text = str(parameters_in_headers).lower()
-
-        start_with_parameters = data.get('start-with-parameters', False)
-        SWP_element = XML.SubElement(root, 'startsWithParameters')
-        SWP_element.text = str(start_with_parameters).lower()
-
-        refresh_frequency = str(data.get('refresh-frequency', 3))
-        XML.SubElement(root, 'refreshFrequency').text = refresh_frequency
-
-        headers = data.get('definition-header', False)
-        DH_element = XML.SubElement(root, 'showPipelineDefinitionHeader')
-        DH_element.text = str(headers).lower()
+        _add_settings(root, data, BUILD_PIPELINE_SETTINGS)
 
         return root
 
 
-class DeliveryPipeline(jenkins_jobs.modules.base.Base):
+class DeliveryPipeline(jenkins_jobs.modules.base_view.BaseView):
     sequence = 0
 
     def root_xml(self, data):
-        linktypes = ['Lightbox', 'New Window']
-        root = XML.Element('se.diabol.jenkins.pipeline.DeliveryPipelineView',
+        root = XML.Element(DELIVERY_PIPELINE_VIEW,
                            {'plugin': 'delivery-pipeline-plugin'})
-        XML.SubElement(root, 'name').text = data['name']
-        desc_text = data.get('description', None)
-        if desc_text is not None:
-            XML.SubElement(root, 'description').text = desc_text
-
-        filterExecutors = data.get('filter-executors', False)
-        XML.SubElement(root, 'filterExecutors').text = str(filterExecutors).lower()
-
-        filterQueue = data.get('filter-queue', False)
-        XML.SubElement(root, 'filterQueue').text = str(filterQueue).lower()
-
-        XML.SubElement(root, 'properties',
-                       {'class': 'hudson.model.View$PropertyList'})
+        self.gen_view(data, root)
 
+        get = data.get
         CS = XML.SubElement(root, 'componentSpecs')
-        Specs = XML.SubElement(CS, 'se.diabol.jenkins.pipeline.DeliveryPipelineView_-ComponentSpec')
-
-        viewname = data.get('name', '')
-        XML.SubElement(Specs,'name').text = viewname
-
-        firstjobname = data.get('first-job', '')
-        XML.SubElement(Specs, 'firstJob').text = firstjobname
-
-        lastjobname = data.get('last-job', '')
-        XML.SubElement(Specs,'lastJob').text = lastjobname
-
-        pipelines = str(data.get('no-of-pipelines', '3'))
-        XML.SubElement(root, 'noOfPipelines').text = pipelines
-
-        showAggregatedPipe = str(data.get('show-aggregated-pipeline', False))
-        XML.SubElement(root,'showAggregatedPipeline').text = str(showAggregatedPipe).lower()
-
-        noofcolumns = str(data.get('no-of-columns', '1'))
-        XML.SubElement(root,'noOfColumns').text=noofcolumns
-
-        sorting = str(data.get('sorting', 'none'))
-        XML.SubElement(root,'sorting').text = str(sorting)
-
-        showavatars = str(data.get('show-avatars', False))
-        XML.SubElement(root,'showAvatars').text = str(showavatars).lower()
-
-        updateinterval = str(data.get('update-interval', '10'))
-        XML.SubElement(root,'updateInterval').text = updateinterval
-
-        showchanges = str(data.get('show-changes', False))
-        XML.SubElement(root,'showChanges').text = str(showchanges).lower()
-
-        allowmanualtrig = str(data.get('allow-manual-triggers', False))
-        XML.SubElement(root,'allowManualTriggers').text = str(allowmanualtrig).lower()
-
-        showtotalbuildt = str(data.get('show-total-build-time', False))
-        XML.SubElement(root,'showTotalBuildTime').text = str(showtotalbuildt).lower()
-
-        allowrebuild = str(data.get('allow-rebuild', False))
-        XML.SubElement(root,'allowRebuild').text = str(allowrebuild).lower()
-
-        allowpipestart = str(data.get('allow-pipeline-start', False))
-        XML.SubElement(root,'allowPipelineStart').text = str(allowpipestart).lower()
-
-        showdesc = str(data.get('show-description', False))
-        XML.SubElement(root,'showDescription').text = str(showdesc).lower()
-
-        showpromo = str(data.get('show-promotions', False))
-        XML.SubElement(root,'showPromotions').text = str(showpromo).lower()
-
-        showtestresult = str(data.get('show-test-results', False))
-        XML.SubElement(root,'showTestResults').text = str(showtestresult).lower()
-
-        showstaticanal = str(data.get('show-static-analysis-results', False))
-        XML.SubElement(root,'showStaticAnalysisResults').text = str(showstaticanal).lower()
-
-        regexpfirstjob = str(data.get('first-job-regexp'))
-        XML.SubElement(root,'regexpFirstJobs').text = regexpfirstjob
-
-        xml_jobs = XML.SubElement(root, 'regexpFirstJobs')
-        jobs = data.get('regexp-first-jobs', [])
-        for job in jobs:
-            xml_job = XML.SubElement(xml_jobs, 'se.diabol.jenkins.pipeline.'
-                                           'DeliveryPipelineView_-RegExpSpec')
-            XML.SubElement(xml_job, 'regexp').text = job
+        Specs = XML.SubElement(CS, COMPONENT_SPEC)
+        XML.SubElement(Specs, 'name').text = get('name', '')
+        XML.SubElement(Specs, 'firstJob').text = get('first-job', '')
+        XML.SubElement(Specs, 'lastJob').text = get('last-job', '')
+
+        _add_settings(root, data, DELIVERY_PIPELINE_SETTINGS)
+
+        jobs = get('regexp-first-jobs')
+        if jobs:
+            xml_jobs = XML.SubElement(root, 'regexpFirstJobs')
+            for job in jobs:
+                xml_job = XML.SubElement(xml_jobs, REGEXP_SPEC)
+                XML.SubElement(xml_job, 'regexp').text = job
 
         return root
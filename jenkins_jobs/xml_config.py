@@ -15,12 +15,24 @@
 
 # Manage Jenkins XML config file output.
 
+import codecs
 import hashlib
+import six
 import sys
 import xml
 from xml.dom import minidom
 import xml.etree.ElementTree as XML
 
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    from xxhash import xxh3_128_hexdigest
+except ImportError:
+    xxh3_128_hexdigest = None
+
 
 # Python 2.6's minidom toprettyxml produces broken output by adding extraneous
 # whitespace around data. This patches the broken implementation with one taken
@@ -59,14 +71,42 @@ if sys.version_info[:3] < (2, 7, 3) or xml.__name__ != 'xml':
     minidom.Element.writexml = writexml
 
 
+def config_hash(xml):
+    """Return the key used to detect changes of a serialized XML config.
+
+    BLAKE3 is used when the blake3 module is installed, then XXH3 when the
+    xxhash module is, falling back to MD5 otherwise. BLAKE3 and XXH3 keys
+    carry a format tag so that keys cached by one algorithm never match
+    keys computed by another one. Text is hashed as its UTF-8 encoding.
+    """
+    if isinstance(xml, six.text_type):
+        xml = xml.encode('utf-8')
+    if blake3 is not None:
+        return 'b3v1:' + blake3(xml).hexdigest(length=16)
+    if xxh3_128_hexdigest is not None:
+        return 'xxh3:' + xxh3_128_hexdigest(xml)
+    return hashlib.md5(xml).hexdigest()
+
+
 class XmlJob(object):
     def __init__(self, xml, name):
         self.xml = xml
         self.name = name
 
     def md5(self):
-        return hashlib.md5(self.output()).hexdigest()
+        return config_hash(self.output())
 
     def output(self):
-        out = minidom.parseString(XML.tostring(self.xml, encoding='UTF-8'))
-        return out.toprettyxml(indent='  ', encoding='utf-8')
+        return self._document().toprettyxml(indent='  ', encoding='utf-8')
+
+    def write_to(self, fileobj):
+        """Write the same content as :meth:`output` to `fileobj` as it is
+        serialized, without building it as a string in memory first.
+
+        :arg file fileobj: file-like object to write the XML to
+        """
+        writer = codecs.getwriter('utf-8')(fileobj)
+        self._document().writexml(writer, '', '  ', '\n', 'utf-8')
+
+    def _document(self):
+        return minidom.parseString(XML.tostring(self.xml, encoding='UTF-8'))
@@ -149,8 +149,10 @@ class BaseTestCase(object):
         if 'view-type' in yaml_content:
             if yaml_content['view-type'] == "list":
                 project = view_list.List(None)
-            elif yaml_content['view-type'] == "pipeline":
-                project = view_pipeline.Pipeline(None)
+            elif yaml_content['view-type'] == "build-pipeline":
+                project = view_pipeline.BuildPipeline(None)
+            elif yaml_content['view-type'] == "delivery-pipeline":
+                project = view_pipeline.DeliveryPipeline(None)
 
         if project:
             xml_project = project.root_xml(yaml_content)
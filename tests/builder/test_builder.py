@@ -14,8 +14,10 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import hashlib
 
 import jenkins_jobs.builder
+import jenkins_jobs.xml_config
 from tests.base import mock
 from testtools import TestCase
 
@@ -38,3 +40,122 @@ class TestCaseTestBuilder(TestCase):
         # Trigger fetching the plugins from jenkins when accessing the property
         self.builder._plugins_list = None
         self.assertEqual(self.builder.plugins_list, ['p1', 'p2'])
+
+    def test_push_items_folders_first(self):
+        items = [(mock.Mock(), md5) for md5 in ('a', 'b', 'c')]
+        for (item, _), name in zip(items, ('f/g/job', 'f/g', 'f')):
+            item.name = name
+
+        pushed = list(self.builder._push_items(lambda i: i, items))
+        self.assertEqual([md5 for _, md5 in pushed], ['c', 'b', 'a'])
+
+    def test_cache_remote_hashes(self):
+        items = [mock.Mock(), mock.Mock(), mock.Mock()]
+        for item, name in zip(items, ('cached', 'remote', 'new')):
+            item.name = name
+        self.builder.cache = mock.Mock()
+        self.builder.cache.is_cached.side_effect = lambda n: n == 'cached'
+        get_md5 = mock.Mock(return_value='e5d3ba1b')
+
+        self.builder._cache_remote_hashes(items, lambda n: n != 'new',
+                                          get_md5)
+        get_md5.assert_called_once_with('remote')
+        self.builder.cache.set.assert_called_once_with('remote', 'e5d3ba1b')
+
+
+class TestCaseTestJenkins(TestCase):
+    def setUp(self):
+        self.jenkins = jenkins_jobs.builder.Jenkins(
+            'http://jenkins.example.com', 'doesnot', 'matter')
+        TestCase.setUp(self)
+
+    @mock.patch.object(jenkins_jobs.builder.jenkins.Jenkins,
+                       'get_job_config')
+    def test_is_managed(self, get_job_config_mock):
+        get_job_config_mock.return_value = (
+            '<project><description>Job description\n'
+            '&lt;!-- Managed by Jenkins Job Builder --&gt;'
+            '</description></project>')
+        self.assertTrue(self.jenkins.is_managed('managed-job'))
+
+    @mock.patch.object(jenkins_jobs.builder.jenkins.Jenkins,
+                       'get_job_config',
+                       return_value='<project><description/></project>')
+    def test_is_managed_no_description(self, get_job_config_mock):
+        self.assertFalse(self.jenkins.is_managed('unmanaged-job'))
+
+    @mock.patch.object(jenkins_jobs.builder.jenkins.Jenkins,
+                       'get_job_config',
+                       return_value='<project><description/></project>')
+    def test_is_managed_memoized(self, get_job_config_mock):
+        self.jenkins.is_managed('unmanaged-job')
+        self.jenkins.is_managed('unmanaged-job')
+        get_job_config_mock.assert_called_once_with('unmanaged-job')
+
+    @mock.patch.object(jenkins_jobs.builder.jenkins.Jenkins, 'job_exists')
+    @mock.patch.object(jenkins_jobs.builder.jenkins.Jenkins, 'get_jobs',
+                       return_value=[{'name': 'job-one'}])
+    def test_is_job_uses_job_list(self, get_jobs_mock, job_exists_mock):
+        self.assertTrue(self.jenkins.is_job('job-one'))
+        self.assertFalse(self.jenkins.is_job('job-two'))
+        self.assertFalse(job_exists_mock.called)
+        get_jobs_mock.assert_called_once_with()
+
+    @mock.patch.object(jenkins_jobs.builder.jenkins.Jenkins, 'job_exists',
+                       return_value=True)
+    @mock.patch.object(jenkins_jobs.builder.jenkins.Jenkins, 'get_jobs',
+                       return_value=[{'name': 'folder'}])
+    def test_is_job_in_folder(self, get_jobs_mock, job_exists_mock):
+        self.assertTrue(self.jenkins.is_job('folder/job-one'))
+        job_exists_mock.assert_called_once_with('folder/job-one')
+
+
+class FakeBlake3(object):
+    # like blake3.blake3, only hashes bytes
+    def __init__(self, data):
+        if not isinstance(data, bytes):
+            raise TypeError('a bytes-like object is required')
+        self.data = data
+
+    def hexdigest(self, length=32):
+        return hashlib.sha256(self.data).hexdigest()[:length * 2]
+
+
+def fake_xxh3_128_hexdigest(data):
+    # like xxhash.xxh3_128_hexdigest, only hashes bytes
+    if not isinstance(data, bytes):
+        raise TypeError('Strings must be encoded before hashing')
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+class TestCaseTestConfigHash(TestCase):
+    xml_text = u'<a>\xe9</a>'
+    xml_bytes = u'<a>\xe9</a>'.encode('utf-8')
+
+    @mock.patch('jenkins_jobs.xml_config.xxh3_128_hexdigest', None)
+    @mock.patch('jenkins_jobs.xml_config.blake3', None)
+    def test_config_hash_md5(self):
+        md5 = hashlib.md5(self.xml_bytes).hexdigest()
+        self.assertEqual(jenkins_jobs.xml_config.config_hash(self.xml_bytes),
+                         md5)
+        self.assertEqual(jenkins_jobs.xml_config.config_hash(self.xml_text),
+                         md5)
+
+    @mock.patch('jenkins_jobs.xml_config.xxh3_128_hexdigest', None)
+    @mock.patch('jenkins_jobs.xml_config.blake3', FakeBlake3)
+    def test_config_hash_blake3(self):
+        key = jenkins_jobs.xml_config.config_hash(self.xml_bytes)
+        self.assertEqual(key, 'b3v1:' + FakeBlake3(self.xml_bytes).hexdigest(
+            length=16))
+        self.assertEqual(jenkins_jobs.xml_config.config_hash(self.xml_text),
+                         key)
+
+    @mock.patch('jenkins_jobs.xml_config.xxh3_128_hexdigest',
+                fake_xxh3_128_hexdigest)
+    @mock.patch('jenkins_jobs.xml_config.blake3', None)
+    def test_config_hash_xxh3(self):
+        key = jenkins_jobs.xml_config.config_hash(self.xml_bytes)
+        self.assertEqual(key,
+                         'xxh3:' + fake_xxh3_128_hexdigest(self.xml_bytes))
+        self.assertEqual(jenkins_jobs.xml_config.config_hash(self.xml_text),
+                         key)
@@ -14,6 +14,7 @@
 # under the License.
 
 import os
+import fixtures
 import testtools
 
 import jenkins_jobs
@@ -26,14 +27,30 @@ class TestCaseCacheStorage(testtools.TestCase):
                 lambda x: '/bad/file')
     def test_save_on_exit(self):
         """
-        Test that the cache is saved on normal object deletion
+        Test that the cache is saved when leaving the outermost with block
         """
 
         with mock.patch('jenkins_jobs.builder.CacheStorage.save') as save_mock:
             with mock.patch('os.path.isfile', return_value=False):
-                jenkins_jobs.builder.CacheStorage("dummy")
+                with jenkins_jobs.builder.CacheStorage("dummy") as cache:
+                    with cache:
+                        pass
+                    self.assertFalse(save_mock.called)
             save_mock.assert_called_once_with()
 
+    @mock.patch('jenkins_jobs.builder.CacheStorage.get_cache_dir',
+                lambda x: '/bad/file')
+    def test_save_unchanged(self):
+        """
+        Test that an unchanged cache is not written out
+        """
+
+        with mock.patch('os.path.isfile', return_value=False):
+            cache = jenkins_jobs.builder.CacheStorage("dummy")
+        with mock.patch('jenkins_jobs.builder.open', create=True) as open_mock:
+            cache.save()
+        self.assertFalse(open_mock.called)
+
     @mock.patch('jenkins_jobs.builder.CacheStorage.get_cache_dir',
                 lambda x: '/bad/file')
     def test_cache_file(self):
@@ -42,5 +59,35 @@ class TestCaseCacheStorage(testtools.TestCase):
         """
         test_file = os.path.abspath(__file__)
         with mock.patch('os.path.join', return_value=test_file):
-            with mock.patch('yaml.load'):
-                jenkins_jobs.builder.CacheStorage("dummy").data = None
+            with mock.patch('yaml.load') as load_mock:
+                cache = jenkins_jobs.builder.CacheStorage("dummy")
+                self.assertFalse(load_mock.called)
+                cache.is_cached('job-one')
+                self.assertEqual(1, load_mock.call_count)
+
+    def test_cache_round_trip(self):
+        """
+        Test that a saved cache is loaded back unchanged.
+        """
+        cache_dir = self.useFixture(fixtures.TempDir()).path
+        with mock.patch('jenkins_jobs.builder.CacheStorage.get_cache_dir',
+                        return_value=cache_dir):
+            cache = jenkins_jobs.builder.CacheStorage("dummy")
+            cache.set('job-one', 'e5d3ba1b')
+            cache.save()
+            cache = jenkins_jobs.builder.CacheStorage("dummy")
+        self.assertFalse(cache.has_changed('job-one', 'e5d3ba1b'))
+
+    @mock.patch('jenkins_jobs.builder.CacheStorage.get_cache_dir',
+                lambda x: '/bad/file')
+    def test_cache_file_name(self):
+        """
+        Test the cache file name derived from the jenkins url.
+        """
+        with mock.patch('os.path.isfile', return_value=False):
+            cache = jenkins_jobs.builder.CacheStorage(
+                "https://jenkins.example.com:8080/~ci-jobs/")
+        self.assertEqual(
+            '/bad/file/cache-host-jobs-'
+            'https___jenkins_example_com_8080_~ci-jobs_.yml',
+            cache.cachefilename)
@@ -18,6 +18,7 @@ import os
 
 from jenkins_jobs import cmd
 from jenkins_jobs import builder
+from jenkins_jobs.errors import JenkinsJobsException
 from tests.base import mock
 from tests.cmd.test_cmd import CmdTestsBase
 
@@ -99,3 +100,53 @@ class UpdateTests(CmdTestsBase):
                           "Called with: %s" % (2, delete_job_mock.call_count,
                                                delete_job_mock.mock_calls))
         delete_job_mock.assert_has_calls(calls, any_order=True)
+
+    @mock.patch('jenkins_jobs.cmd.Builder')
+    def test_update_workers(self, builder_mock):
+        """
+        Test the workers setting is read from the config file
+        """
+        builder_mock.return_value.update_job.return_value = ([], [], 0, 0)
+        self.config.set('jenkins', 'workers', '4')
+
+        path = os.path.join(self.fixtures_path, 'cmd-002.yaml')
+        args = self.parser.parse_args(['update', path])
+
+        cmd.execute(args, self.config)
+        self.assertEqual(4, builder_mock.call_args[1]['workers'])
+
+    @mock.patch('jenkins_jobs.cmd.Builder')
+    def test_update_workers_option(self, builder_mock):
+        """
+        Test --workers overrides the workers setting of the config file
+        """
+        builder_mock.return_value.update_job.return_value = ([], [], 0, 0)
+        self.config.set('jenkins', 'workers', '4')
+
+        path = os.path.join(self.fixtures_path, 'cmd-002.yaml')
+        args = self.parser.parse_args(['update', '--workers', '1', path])
+
+        cmd.execute(args, self.config)
+        self.assertEqual(1, builder_mock.call_args[1]['workers'])
+
+    def test_update_workers_zero(self):
+        """
+        Test --workers 0 is rejected
+        """
+        path = os.path.join(self.fixtures_path, 'cmd-002.yaml')
+        args = self.parser.parse_args(['update', '--workers', '0', path])
+
+        self.assertRaises(JenkinsJobsException, cmd.execute, args,
+                          self.config)
+
+    def test_update_workers_not_integer(self):
+        """
+        Test a non-integer workers setting of the config file is rejected
+        """
+        self.config.set('jenkins', 'workers', 'many')
+
+        path = os.path.join(self.fixtures_path, 'cmd-002.yaml')
+        args = self.parser.parse_args(['update', path])
+
+        self.assertRaises(JenkinsJobsException, cmd.execute, args,
+                          self.config)
@@ -22,4 +22,4 @@ from tests.base import get_scenarios, BaseTestCase
 class TestCaseModuleViews(TestWithScenarios, TestCase, BaseTestCase):
     fixtures_path = os.path.join(os.path.dirname(__file__), 'fixtures')
     scenarios = get_scenarios(fixtures_path)
-    klass = view_pipeline.Pipeline
+    klass = view_pipeline.BuildPipeline